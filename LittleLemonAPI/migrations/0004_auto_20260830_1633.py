@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-08-30 16:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LittleLemonAPI', '0003_order_date'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='cart',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(fields=('menuitem', 'user'), name='unique_cart_menuitem_user'),
+        ),
+    ]
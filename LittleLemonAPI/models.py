@@ -28,7 +28,12 @@ class Cart(models.Model):
     price = models.DecimalField(max_digits=6, decimal_places=2)
 
     class Meta:
-        unique_together = ('menuitem', 'user')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['menuitem', 'user'],
+                name='unique_cart_menuitem_user',
+            ),
+        ]
 
 
 class Order(models.Model):
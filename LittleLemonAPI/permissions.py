@@ -1,12 +1,24 @@
 from rest_framework.permissions import BasePermission
 
 
+def _user_group_names(user):
+    """
+    Returns the set of group names the user belongs to,
+    fetched once per request and cached on the user instance.
+    """
+    names = getattr(user, '_cached_group_names', None)
+    if names is None:
+        names = set(user.groups.values_list('name', flat=True))
+        user._cached_group_names = names
+    return names
+
+
 class IsManager(BasePermission):
 
     message = "Only managers are allowed to do this action."
 
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='manager').exists()
+        return 'manager' in _user_group_names(request.user)
 
 
 class IsCustomer(BasePermission):
@@ -14,7 +26,7 @@ class IsCustomer(BasePermission):
     message = "Only customers are allowed to do this action."
 
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='customer').exists()
+        return 'customer' in _user_group_names(request.user)
 
 
 class IsDeliveryCrew(BasePermission):
@@ -22,4 +34,32 @@ class IsDeliveryCrew(BasePermission):
     message = "Only delivery crews are allowed to do this action."
 
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='delivery_crew').exists()
+        return 'delivery_crew' in _user_group_names(request.user)
+
+
+class OrderRolePermission(BasePermission):
+    """
+    Per-method role rules for the order endpoints, checked against
+    the cached group-name set in a single permission:
+        - customers place orders and retrieve their own;
+        - managers update and delete orders;
+        - managers and delivery crews can PATCH the status.
+    """
+
+    message = "You are not allowed to do this action."
+
+    def has_permission(self, request, view):
+        names = _user_group_names(request.user)
+        method = request.method
+
+        if method == 'POST' or (
+                method == 'GET' and view.action == 'retrieve'):
+            return 'customer' in names
+
+        if method == 'PUT' or method == 'DELETE':
+            return 'manager' in names
+
+        if method == 'PATCH':
+            return 'manager' in names or 'delivery_crew' in names
+
+        return True
@@ -1,9 +1,10 @@
 from rest_framework import serializers
-from rest_framework.validators import UniqueTogetherValidator
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import Group
+from django.db import IntegrityError, connection, transaction
 from django.db.models import Sum
+from .permissions import _user_group_names
+from .utils import get_group
 from .models import (
     Category,
     MenuItem,
@@ -25,8 +26,7 @@ class UserSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         user = get_user_model().objects.create_user(**validated_data)
-        customer_group = Group.objects.get(name='customer')
-        user.groups.add(customer_group)
+        user.groups.add(get_group('customer'))
         return user
 
 
@@ -53,13 +53,6 @@ class CartSerializer(serializers.ModelSerializer):
         model = Cart
         fields = '__all__'
         read_only_fields = ['unit_price', 'price']
-        validators = [
-            UniqueTogetherValidator(
-                queryset=Cart.objects.all(),
-                fields=['user', 'menuitem'],
-                message="Item is already in the cart."
-            )
-        ]
 
     def validate(self, attrs):
         if attrs['quantity'] <= 0:
@@ -75,7 +68,16 @@ class CartSerializer(serializers.ModelSerializer):
         price = unit_price * quantity
         validated_data['unit_price'] = unit_price
         validated_data['price'] = price
-        return super().create(validated_data)
+
+        # Uniqueness of (user, menuitem) is enforced by the database
+        # constraint instead of a validator, so the insert does not
+        # need a SELECT beforehand.
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                "Item is already in the cart."
+            )
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -87,8 +89,13 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'total', 'date']
 
     def validate(self, attrs):
+        # The delivery-crew restriction only applies to updates;
+        # skip the group lookup entirely when placing an order.
+        if self.instance is None:
+            return attrs
+
         user = self.context['request'].user
-        if user.groups.filter(name='delivery_crew').exists():
+        if 'delivery_crew' in _user_group_names(user):
             if len(attrs) > 1 or ('status' not in attrs):
                 raise serializers.ValidationError({
                     'detail': 'Only status field is editable.',
@@ -98,32 +105,47 @@ class OrderSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context['request'].user
 
-        if not Cart.objects.filter(user=user).exists():
-            raise serializers.ValidationError({
-                'detail': 'Cart is empty.',
-            }, code=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            # Evaluate the locking SELECT so the cart rows really are
+            # locked against a concurrent checkout; aggregate() and
+            # delete() on a select_for_update() queryset would not
+            # carry FOR UPDATE themselves.
+            cart_ids = list(
+                Cart.objects.filter(user=user)
+                .select_for_update()
+                .values_list('pk', flat=True)
+            )
 
-        carts = Cart.objects.filter(user=user)
-        order_total = carts.aggregate(Sum('price')).get('price__sum')
-        order_data = {
-            'user': user,
-            'total': order_total,
-        }
-        order = Order.objects.create(**order_data)
-
-        order_items = []
-        for cart in carts:
-            order_item = OrderItem(
-                order=order,
-                menuitem=cart.menuitem,
-                quantity=cart.quantity,
-                unit_price=cart.unit_price,
-                price=cart.price
+            if not cart_ids:
+                raise serializers.ValidationError({
+                    'detail': 'Cart is empty.',
+                }, code=status.HTTP_400_BAD_REQUEST)
+
+            carts = Cart.objects.filter(pk__in=cart_ids)
+            order_total = carts.aggregate(total=Sum('price'))['total']
+            order_data = {
+                'user': user,
+                'total': order_total,
+            }
+            order = Order.objects.create(**order_data)
+
+            # Copy the locked cart rows into order items server-side,
+            # without materializing them as Python objects.
+            copy_sql = (
+                'INSERT INTO {orderitem} '
+                '(order_id, menuitem_id, quantity, unit_price, price) '
+                'SELECT %s, menuitem_id, quantity, unit_price, price '
+                'FROM {cart} WHERE {pk} IN ({placeholders})'
+            ).format(
+                orderitem=connection.ops.quote_name(OrderItem._meta.db_table),
+                cart=connection.ops.quote_name(Cart._meta.db_table),
+                pk=connection.ops.quote_name(Cart._meta.pk.column),
+                placeholders=', '.join(['%s'] * len(cart_ids)),
             )
-            order_items.append(order_item)
 
-        OrderItem.objects.bulk_create(order_items)
-        carts.delete()
+            with connection.cursor() as cursor:
+                cursor.execute(copy_sql, [order.id, *cart_ids])
+            carts.delete()
 
         return order
 
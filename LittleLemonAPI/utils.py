@@ -0,0 +1,45 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+
+_group_cache = {}
+
+
+def get_group(name):
+    """
+    Returns the Group with the given name.
+
+    The groups are fixed rows (manager, customer, delivery_crew), so
+    each one is fetched from the database once per process and reused
+    afterwards instead of querying auth_group on every call.
+    """
+    group = _group_cache.get(name)
+    if group is None:
+        group = Group.objects.get(name=name)
+        _group_cache[name] = group
+    return group
+
+
+def set_only_group(user, group):
+    """
+    Makes the given group the user's only group.
+    Accepts a user instance or a user primary key.
+
+    user.groups.set() first fetches the current memberships to diff
+    them before adding and removing. Writing the membership table
+    directly needs just one DELETE and one conflict-ignoring INSERT,
+    which also covers what a get_or_create pair would do.
+    """
+    membership = get_user_model().groups.through
+    user_id = getattr(user, 'pk', user)
+
+    # Keep the swap atomic so a failure between the two statements
+    # cannot leave the user without any group.
+    with transaction.atomic():
+        membership.objects.filter(
+            user_id=user_id
+        ).exclude(group=group).delete()
+        membership.objects.bulk_create(
+            [membership(user_id=user_id, group=group)],
+            ignore_conflicts=True,
+        )
@@ -11,9 +11,11 @@ from rest_framework import (
 )
 
 from django.contrib.auth import get_user_model
-from django.contrib.auth.models import Group
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_page
 
 from . import permissions as custom_perms
+from .utils import get_group, set_only_group
 from .models import (
     Category,
     MenuItem,
@@ -26,7 +28,6 @@ from .serializers import (
     MenuItemSerializer,
     CartSerializer,
     OrderSerializer,
-    OrderItemSerializer,
 )
 
 
@@ -66,6 +67,12 @@ class ListCategories(generics.ListAPIView):
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    # Categories rarely change and look the same for every user,
+    # so serve the list from the in-memory cache for a short while.
+    @method_decorator(cache_page(60))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
 
 class MenuItemViewSet(viewsets.ModelViewSet):
     """
@@ -78,7 +85,11 @@ class MenuItemViewSet(viewsets.ModelViewSet):
         - Only "manager" group is allowed to create, update, and
           delete a menu item.
     """
-    queryset = MenuItem.objects.all()
+    # Fetch only the columns the serializer renders, keeping the row
+    # width fixed if extra fields are ever added to MenuItem.
+    queryset = MenuItem.objects.only(
+        'title', 'price', 'featured', 'category',
+    )
     serializer_class = MenuItemSerializer
     permission_classes = [
         permissions.IsAuthenticated,
@@ -119,13 +130,13 @@ class GroupView(mixins.ListModelMixin, generics.GenericAPIView):
             self.role = 'manager'
             self.queryset = get_user_model().objects.filter(
                 groups__name='manager'
-            )
+            ).prefetch_related('groups')
 
         elif role == 'delivery-crew':
             self.role = 'delivery_crew'
             self.queryset = get_user_model().objects.filter(
                 groups__name='delivery_crew'
-            )
+            ).prefetch_related('groups')
 
         else:
             raise NotFound()
@@ -138,21 +149,26 @@ class GroupView(mixins.ListModelMixin, generics.GenericAPIView):
     def post(self, request, *args, **kwargs):
         username = request.data.get('username')
 
-        try:
-            user = get_user_model().objects.get(username=username)
+        user_id = get_user_model().objects.filter(
+            username=username
+        ).values_list('pk', flat=True).first()
 
-        except get_user_model().DoesNotExist:
+        if user_id is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
-        belonged_group = Group.objects.get(name=self.role)
-        user.groups.set([belonged_group])
+        set_only_group(user_id, get_group(self.role))
 
         return Response(status=status.HTTP_201_CREATED)
 
     def delete(self, request, *args, **kwargs):
-        user = self.get_object()
-        customer_group = Group.objects.get(name='customer')
-        user.groups.set([customer_group])
+        user_id = self.get_queryset().filter(
+            pk=kwargs.get('pk')
+        ).values_list('pk', flat=True).first()
+
+        if user_id is None:
+            raise NotFound()
+
+        set_only_group(user_id, get_group('customer'))
 
         return Response(status=status.HTTP_200_OK)
 
@@ -175,8 +191,7 @@ class ListCreateDeleteCartView(
     authentication_classes = [authentication.TokenAuthentication]
 
     def get_queryset(self):
-        self.queryset = Cart.objects.filter(user=self.request.user)
-        return super().get_queryset()
+        return Cart.objects.filter(user=self.request.user)
 
     def get(self, request, *args, **kwargs):
         return self.list(request, *args, **kwargs)
@@ -185,13 +200,13 @@ class ListCreateDeleteCartView(
         return self.create(request, *args, **kwargs)
 
     def delete(self, request, *args, **kwargs):
+        deleted, _ = self.get_queryset().delete()
 
-        if not self.get_queryset().exists():
+        if not deleted:
             return Response({
                 'detail': 'Cart is already empty.'
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        self.get_queryset().delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -209,8 +224,17 @@ class DeleteSingleItemCart(generics.DestroyAPIView):
     authentication_classes = [authentication.TokenAuthentication]
 
     def get_queryset(self):
-        self.queryset = Cart.objects.filter(user=self.request.user)
-        return super().get_queryset()
+        return Cart.objects.filter(user=self.request.user)
+
+    def destroy(self, request, *args, **kwargs):
+        deleted, _ = self.get_queryset().filter(
+            pk=kwargs.get('pk')
+        ).delete()
+
+        if not deleted:
+            raise NotFound()
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class OrderViewSet(viewsets.ModelViewSet):
@@ -231,7 +255,10 @@ class OrderViewSet(viewsets.ModelViewSet):
             - PATCH, update the order status to 0 or 1
     """
     serializer_class = OrderSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [
+        permissions.IsAuthenticated,
+        custom_perms.OrderRolePermission,
+    ]
     authentication_classes = [authentication.TokenAuthentication]
     throttle_classes = [UserRateThrottle]
 
@@ -240,43 +267,34 @@ class OrderViewSet(viewsets.ModelViewSet):
     search_fields = ['delivery_crew__username', 'user__username']
     throttle_classes = [UserRateThrottle]
 
-    def get_permissions(self):
-        method = self.request.method
-
-        if (method == 'GET' and self.action == 'retrieve') or method == 'POST':
-            self.permission_classes = [
-                permissions.IsAuthenticated,
-                custom_perms.IsCustomer,
-            ]
-
-        elif method == 'PUT' or method == 'DELETE':
-            self.permission_classes = [
-                permissions.IsAuthenticated,
-                custom_perms.IsManager,
-            ]
-
-        elif method == 'PATCH':
-            self.permission_classes = [
-                permissions.IsAuthenticated,
-                custom_perms.IsManager | custom_perms.IsDeliveryCrew,
-            ]
+    def perform_authentication(self, request):
+        super().perform_authentication(request)
 
-        return super().get_permissions()
+        # Warm the per-request group-name cache right after token
+        # authentication, so the permission classes, get_queryset, and
+        # the serializer all share the same single group query.
+        if request.user.is_authenticated:
+            custom_perms._user_group_names(request.user)
 
     def get_queryset(self):
         user = self.request.user
-        group = user.groups.all()
+        group_names = custom_perms._user_group_names(user)
+
+        if 'manager' in group_names:
+            queryset = Order.objects.all()
 
-        if group.filter(name='manager').exists():
-            self.queryset = Order.objects.all()
+        elif 'customer' in group_names:
+            queryset = Order.objects.filter(user=user)
 
-        elif group.filter(name='customer').exists():
-            self.queryset = Order.objects.filter(user=user)
+        elif 'delivery_crew' in group_names:
+            queryset = Order.objects.filter(delivery_crew=user)
 
-        elif group.filter(name='delivery_crew').exists():
-            self.queryset = Order.objects.filter(delivery_crew=user)
+        else:
+            queryset = Order.objects.none()
 
-        return super().get_queryset()
+        # The serializer renders user as a string and exposes
+        # delivery_crew; join both in instead of querying per row.
+        return queryset.select_related('user', 'delivery_crew')
 
     def retrieve(self, request, *args, **kwargs):
         user = request.user
@@ -285,7 +303,15 @@ class OrderViewSet(viewsets.ModelViewSet):
         if user != order.user:
             return Response(status=status.HTTP_400_BAD_REQUEST)
 
-        order_items = order.orderitem_set.all()
-        serialized = OrderItemSerializer(order_items, many=True)
+        # The items are flat rows; serialize them as plain dicts
+        # straight from the database instead of building model
+        # instances for a ModelSerializer to take apart again.
+        order_items = order.orderitem_set.values(
+            'id', 'order', 'menuitem', 'quantity', 'unit_price', 'price',
+        )
+        page = self.paginate_queryset(order_items)
+
+        if page is not None:
+            return self.get_paginated_response(page)
 
-        return Response(serialized.data, status=status.HTTP_200_OK)
+        return Response(list(order_items), status=status.HTTP_200_OK)